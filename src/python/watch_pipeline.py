@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from parse_moments import parse_moments, save_parsed_data, generate_summary
+from filter_long_moments import filter_long_content
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "..", ".."))
+
+BACKUP_DIR = os.path.join(PROJECT_ROOT, "data", "raw")
+DEFINITIONS_DIR = os.path.join(PROJECT_ROOT, "data", "queries", "definitions")
+GRAPHS_DIR = os.path.expanduser(os.path.join("~", ".logseq", "graphs"))
+QUERY_SCRIPT = os.path.join(PROJECT_ROOT, "src", "shell", "query_to_markdown.sh")
+STATUS_FILE = os.path.join(PROJECT_ROOT, "data", "processed", "watch_status.json")
+
+# Graph queried by query_to_markdown.sh (GRAPH_NAME there)
+GRAPH_NAME = "yihan_main_LOGSEQ"
+
+MOMENTS_JOB = "moments"
+
+
+def snapshot(directory, suffix):
+    """
+    Collect (mtime, size) for every file under directory ending with suffix
+
+    Args:
+        directory: Directory to scan recursively
+        suffix: File extension to match
+
+    Returns:
+        Dictionary mapping file path to (mtime_ns, size)
+    """
+    files = {}
+    if not os.path.isdir(directory):
+        return files
+    for root, _dirs, names in os.walk(directory):
+        for name in names:
+            if not name.endswith(suffix):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def changed_paths(old, new):
+    """Return the paths that were added, removed or modified between two snapshots"""
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+def graph_name_of(path):
+    """Graph name encoded in a .transit file name, as resolved by extract_recursive_ordered.cljs"""
+    match = re.search(r"\+\+([^+]+)\.transit$", path)
+    return match.group(1) if match else None
+
+
+def query_job_name(query_file):
+    """Job name for a query definition, matching the output name used by query_to_markdown.sh"""
+    return os.path.splitext(os.path.basename(query_file))[0]
+
+
+def run_moments(backup_dir):
+    """
+    Regenerate parsed moments, long moments and the moments summary from the newest backup
+
+    Args:
+        backup_dir: Directory containing WeChat Moments backup JSON files
+    """
+    backups = snapshot(backup_dir, ".json")
+    if not backups:
+        raise RuntimeError(f"No backup JSON files found in {backup_dir}")
+    input_file = max(backups, key=lambda path: backups[path][0])
+
+    parsed_file = os.path.join(PROJECT_ROOT, "data", "processed", "parsed_moments.json")
+    long_file = os.path.join(PROJECT_ROOT, "data", "processed", "long_moments.json")
+    summary_file = os.path.join(PROJECT_ROOT, "analysis", "reports", "moments_summary.md")
+
+    parsed_data = parse_moments(input_file)
+    if not parsed_data:
+        raise RuntimeError(f"No moments extracted from {input_file}")
+    save_parsed_data(parsed_data, parsed_file)
+    generate_summary(parsed_data, summary_file)
+    filter_long_content(parsed_file, long_file)
+
+
+def run_query(query_file):
+    """
+    Regenerate the ordered EDN and markdown report for a single query definition
+
+    Args:
+        query_file: Path to the query .edn file
+    """
+    subprocess.run([QUERY_SCRIPT, query_file], cwd=PROJECT_ROOT, check=True)
+
+
+class Watcher:
+    """
+    Poll the backup directory, Logseq graph files and query definitions, and
+    regenerate only the outputs affected by each burst of changes.
+
+    Jobs are keyed by output name, so repeated changes to the same source while
+    a job is queued collapse into one run, and changes while it is running
+    trigger exactly one follow-up run.
+    """
+
+    def __init__(self, backup_dir=BACKUP_DIR, definitions_dir=DEFINITIONS_DIR,
+                 graphs_dir=GRAPHS_DIR, graph_name=GRAPH_NAME, status_file=STATUS_FILE,
+                 interval=1.0, debounce=2.0, workers=2):
+        self.backup_dir = backup_dir
+        self.definitions_dir = definitions_dir
+        self.graphs_dir = graphs_dir
+        self.graph_name = graph_name
+        self.status_file = status_file
+        self.interval = interval
+        self.debounce = debounce
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        # Held while a job runs, so jobs waiting for a worker stay in queued
+        self.slots = asyncio.Semaphore(workers)
+
+        self.snapshots = {}
+        self.pending = {}      # job name -> callable, waiting for the debounce window
+        self.queued = set()    # job names waiting for a free worker
+        self.running = set()
+        self.dirty = set()     # job names changed again while running
+        self.jobs = {}         # job name -> callable, latest definition
+        self.stats = {}
+        self.tasks = set()     # running job tasks, kept so they are not garbage collected
+        self.last_change = 0.0
+
+    def sources(self):
+        return {
+            "backup": (self.backup_dir, ".json"),
+            "graphs": (self.graphs_dir, ".transit"),
+            "definitions": (self.definitions_dir, ".edn"),
+        }
+
+    def poll(self):
+        """Rescan all sources and return the set of changed paths per source"""
+        changes = {}
+        for source, (directory, suffix) in self.sources().items():
+            current = snapshot(directory, suffix)
+            previous = self.snapshots.get(source)
+            self.snapshots[source] = current
+            if previous is not None:
+                changes[source] = changed_paths(previous, current)
+        return changes
+
+    def affected_jobs(self, changes):
+        """Map changed paths to the regeneration jobs that depend on them"""
+        jobs = {}
+        if changes.get("backup"):
+            jobs[MOMENTS_JOB] = lambda: run_moments(self.backup_dir)
+
+        graph_changes = {path for path in changes.get("graphs", set())
+                         if graph_name_of(path) == self.graph_name}
+        if graph_changes:
+            # Every query reads the graph, so a graph change invalidates them all
+            query_files = self.snapshots.get("definitions", {})
+        else:
+            query_files = changes.get("definitions", set())
+        for query_file in query_files:
+            if os.path.isfile(query_file):
+                jobs[query_job_name(query_file)] = lambda path=query_file: run_query(path)
+        return jobs
+
+    async def run_job(self, name):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                queued_at = time.monotonic()
+                async with self.slots:
+                    self.queued.discard(name)
+                    self.running.add(name)
+                    self.write_status()
+                    started = time.monotonic()
+                    try:
+                        await loop.run_in_executor(self.executor, self.jobs[name])
+                        result, error = "ok", None
+                    except Exception as e:
+                        result, error = "error", str(e)
+                        print(f"Job {name} failed: {e}")
+                    finally:
+                        self.running.discard(name)
+                latency = time.monotonic() - started
+                self.stats[name] = {
+                    "last_run": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "last_latency_seconds": round(latency, 3),
+                    "last_queue_wait_seconds": round(started - queued_at, 3),
+                    "last_result": result,
+                    "last_error": error,
+                    "runs": self.stats.get(name, {}).get("runs", 0) + 1,
+                }
+                print(f"Job {name} finished ({result}) in {latency:.2f}s")
+                if name not in self.dirty:
+                    break
+                self.dirty.discard(name)
+                self.queued.add(name)
+        finally:
+            # Never leave the job marked as queued or running, or flush() would
+            # only ever mark it dirty and it would not run again
+            self.queued.discard(name)
+            self.running.discard(name)
+            self.dirty.discard(name)
+            self.write_status()
+
+    def flush(self):
+        """Hand debounced jobs to the executor, coalescing with queued or running ones"""
+        for name, job in self.pending.items():
+            self.jobs[name] = job
+            if name in self.running:
+                self.dirty.add(name)
+            elif name not in self.queued:
+                self.queued.add(name)
+                task = asyncio.create_task(self.run_job(name))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+        self.pending = {}
+        self.write_status()
+
+    def write_status(self):
+        status = {
+            "updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "queue_depth": len(self.queued) + len(self.dirty),
+            "pending": sorted(self.pending),
+            "queued": sorted(self.queued),
+            "running": sorted(self.running),
+            "jobs": self.stats,
+        }
+        tmp_file = self.status_file + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.status_file), exist_ok=True)
+            with open(tmp_file, 'w', encoding='utf-8') as file:
+                json.dump(status, file, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.status_file)
+        except OSError as e:
+            print(f"Error writing status file: {e}")
+
+    async def watch(self):
+        print(f"Watching {self.backup_dir}, {self.graphs_dir} (graph {self.graph_name}) and {self.definitions_dir}")
+        print(f"Status file: {self.status_file}")
+        self.poll()
+        self.write_status()
+        while True:
+            await asyncio.sleep(self.interval)
+            jobs = self.affected_jobs(self.poll())
+            if jobs:
+                self.pending.update(jobs)
+                self.last_change = time.monotonic()
+                self.write_status()
+            elif self.pending and time.monotonic() - self.last_change >= self.debounce:
+                self.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate moments and query outputs when their sources change")
+    parser.add_argument("--interval", type=float, default=1.0, help="Polling interval in seconds (default: 1.0)")
+    parser.add_argument("--debounce", type=float, default=2.0, help="Quiet period before running jobs (default: 2.0)")
+    parser.add_argument("--workers", type=int, default=2, help="Maximum concurrent jobs (default: 2)")
+    parser.add_argument("--status-file", default=STATUS_FILE, help="Where to write the status JSON")
+    args = parser.parse_args()
+
+    watcher = Watcher(status_file=args.status_file, interval=args.interval,
+                      debounce=args.debounce, workers=args.workers)
+    try:
+        asyncio.run(watcher.watch())
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    finally:
+        watcher.executor.shutdown(wait=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -100,12 +100,20 @@ python_scripts=(
     "src/python/filter_long_moments.py"
     "src/python/analyze_json_schema.py"
     "src/python/simple_schema_analyzer.py"
+    "src/python/watch_pipeline.py"
 )
 
 for script in "${python_scripts[@]}"; do
     test_script "$script" "$(basename "$script")"
 done
 
+echo -n "watch_pipeline.py unit tests... "
+if python3 -m unittest discover -s tests -p "test_*.py" >/dev/null 2>&1; then
+    echo "✅ PASSED"
+else
+    echo "❌ FAILED (python3 -m unittest discover -s tests)"
+fi
+
 echo ""
 echo "📝 Testing ClojureScript Files..."
 echo "--------------------------------"
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "python"))
+
+import watch_pipeline
+
+
+def write(path, content):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(content)
+
+
+class WatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        for name in ("raw", "definitions", "graphs"):
+            os.makedirs(os.path.join(root, name))
+        self.query_file = os.path.join(root, "definitions", "q.edn")
+        self.other_query_file = os.path.join(root, "definitions", "other.edn")
+        write(self.query_file, "[:find ?b]")
+        write(self.other_query_file, "[:find ?p]")
+        self.status_file = os.path.join(root, "status.json")
+
+        self.calls = []
+        self.original_run_query = watch_pipeline.run_query
+        watch_pipeline.run_query = self.calls.append
+
+    def tearDown(self):
+        watch_pipeline.run_query = self.original_run_query
+        self.tmp.cleanup()
+
+    def make_watcher(self, **kwargs):
+        root = self.tmp.name
+        options = dict(interval=0.02, debounce=0.2, status_file=self.status_file)
+        options.update(kwargs)
+        return watch_pipeline.Watcher(
+            backup_dir=os.path.join(root, "raw"),
+            definitions_dir=os.path.join(root, "definitions"),
+            graphs_dir=os.path.join(root, "graphs"),
+            graph_name="main",
+            **options,
+        )
+
+    def graph_file(self, name):
+        return os.path.join(self.tmp.name, "graphs", f"logseq_local_++{name}.transit")
+
+    async def drain(self, watcher):
+        while watcher.tasks:
+            await asyncio.gather(*watcher.tasks)
+
+    def test_burst_of_writes_runs_once(self):
+        watcher = self.make_watcher()
+
+        async def scenario():
+            task = asyncio.create_task(watcher.watch())
+            await asyncio.sleep(0.1)
+            for i in range(5):
+                write(self.query_file, "x" * (i + 1))
+                await asyncio.sleep(0.03)
+            await asyncio.sleep(0.5)
+            task.cancel()
+            await self.drain(watcher)
+
+        asyncio.run(scenario())
+        self.assertEqual(self.calls, [self.query_file])
+
+        with open(self.status_file, encoding='utf-8') as file:
+            status = json.load(file)
+        self.assertEqual(status["queue_depth"], 0)
+        self.assertEqual(status["running"], [])
+        self.assertEqual(status["jobs"]["q"]["runs"], 1)
+        self.assertEqual(status["jobs"]["q"]["last_result"], "ok")
+
+    def test_changes_during_run_trigger_one_follow_up(self):
+        watcher = self.make_watcher()
+        started = threading.Event()
+        release = threading.Event()
+        runs = []
+
+        def job():
+            runs.append(len(runs))
+            started.set()
+            release.wait(5)
+
+        async def scenario():
+            watcher.pending["q"] = job
+            watcher.flush()
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            for _ in range(3):
+                watcher.pending["q"] = job
+                watcher.flush()
+            self.assertEqual(watcher.dirty, {"q"})
+            self.assertEqual(len(watcher.tasks), 1)
+            release.set()
+            await self.drain(watcher)
+
+        asyncio.run(scenario())
+        self.assertEqual(len(runs), 2)
+        self.assertEqual(watcher.stats["q"]["runs"], 2)
+        self.assertFalse(watcher.queued or watcher.running or watcher.dirty)
+
+    def test_jobs_waiting_for_a_worker_stay_queued(self):
+        watcher = self.make_watcher(workers=1)
+        started = {name: threading.Event() for name in ("a", "b")}
+        release = {name: threading.Event() for name in ("a", "b")}
+
+        def blocking_job(name):
+            def job():
+                started[name].set()
+                release[name].wait(5)
+            return job
+
+        def read_status():
+            with open(self.status_file, encoding='utf-8') as file:
+                return json.load(file)
+
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            watcher.pending["a"] = blocking_job("a")
+            watcher.pending["b"] = blocking_job("b")
+            watcher.flush()
+            await loop.run_in_executor(None, started["a"].wait, 5)
+
+            status = read_status()
+            self.assertEqual(status["running"], ["a"])
+            self.assertEqual(status["queued"], ["b"])
+            self.assertGreaterEqual(status["queue_depth"], 1)
+
+            await asyncio.sleep(0.3)
+            self.assertFalse(started["b"].is_set())
+            release["a"].set()
+            await loop.run_in_executor(None, started["b"].wait, 5)
+
+            status = read_status()
+            self.assertEqual(status["running"], ["b"])
+            self.assertEqual(status["queued"], [])
+            release["b"].set()
+            await self.drain(watcher)
+
+        asyncio.run(scenario())
+        self.assertGreaterEqual(watcher.stats["b"]["last_queue_wait_seconds"], 0.3)
+        self.assertLess(watcher.stats["b"]["last_latency_seconds"], 0.3)
+        self.assertLess(watcher.stats["a"]["last_queue_wait_seconds"], 0.3)
+
+    def test_only_watched_graph_reruns_queries(self):
+        watcher = self.make_watcher()
+        watcher.poll()
+
+        write(self.graph_file("other"), "graph")
+        self.assertEqual(watcher.affected_jobs(watcher.poll()), {})
+
+        write(self.graph_file("main"), "graph")
+        self.assertEqual(set(watcher.affected_jobs(watcher.poll())), {"q", "other"})
+
+    def test_definition_change_reruns_only_that_query(self):
+        watcher = self.make_watcher()
+        watcher.poll()
+
+        write(self.other_query_file, "[:find ?p ?q]")
+        self.assertEqual(set(watcher.affected_jobs(watcher.poll())), {"other"})
+
+    def test_failed_status_write_does_not_wedge_job(self):
+        blocker = os.path.join(self.tmp.name, "blocker")
+        write(blocker, "")
+        watcher = self.make_watcher(status_file=os.path.join(blocker, "status.json"))
+
+        async def scenario():
+            for _ in range(2):
+                watcher.pending["q"] = lambda: self.calls.append("q")
+                watcher.flush()
+                await self.drain(watcher)
+
+        asyncio.run(scenario())
+        self.assertEqual(self.calls, ["q", "q"])
+        self.assertFalse(watcher.queued or watcher.running)
+
+    def test_missing_job_is_recorded_and_released(self):
+        watcher = self.make_watcher()
+
+        async def scenario():
+            watcher.queued.add("missing")
+            await watcher.run_job("missing")
+
+        asyncio.run(scenario())
+        self.assertEqual(watcher.stats["missing"]["last_result"], "error")
+        self.assertFalse(watcher.queued or watcher.running)
+
+
+if __name__ == "__main__":
+    unittest.main()